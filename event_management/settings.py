@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'events.serving.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,10 +98,33 @@ USE_TZ = True
 
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'events.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Hashed static names never change content, so they can be cached for a year.
+STATIC_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+STATIC_UNHASHED_MAX_AGE = 60
+# Media keeps its upload names and defaults can be replaced in place, so it is
+# only fresh briefly and then revalidated against its ETag (a cheap 304).
+MEDIA_CACHE_MAX_AGE = 60 * 5
+
+# Set to 'X-Accel-Redirect' (nginx) or 'X-Sendfile' (Apache/lighttpd) to let
+# the front-end server send media files. MEDIA_SENDFILE_URL is the nginx
+# internal location mapped to MEDIA_ROOT.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_SENDFILE_URL = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
@@ -1,10 +1,18 @@
+import re
+from urllib.parse import urlsplit
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from events.serving import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('events.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# An absolute MEDIA_URL points at another host, which serves the files itself.
+if not urlsplit(settings.MEDIA_URL).netloc:
+    urlpatterns.append(
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    )
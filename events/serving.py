@@ -0,0 +1,216 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ARCHIVE_TYPES = {'gzip': 'application/gzip', 'br': 'application/x-brotli', 'bzip2': 'application/x-bzip2', 'xz': 'application/x-xz'}
+
+
+class RangeFile:
+    """Wraps an open file so that reads stop after `length` bytes."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def resolve_path(document_root, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found.')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found.')
+    return fullpath
+
+
+def parse_accept_encoding(header):
+    codings = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def pick_encoding(request, fullpath):
+    codings = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+    for encoding, suffix in ENCODINGS:
+        if codings.get(encoding, codings.get('*', 0)) > 0 and os.path.isfile(fullpath + suffix):
+            return encoding, fullpath + suffix
+    return None, fullpath
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        suffix = int(end)
+        if suffix == 0 or size == 0:
+            raise ValueError
+        return max(size - suffix, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        # RFC 9110 14.1.1: an invalid range means the header is ignored.
+        return None
+    if start >= size:
+        raise ValueError
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def if_range_matches(request, etag, mtime_ns):
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    return parse_http_date_safe(value) == mtime_ns // 10**9
+
+
+def serve_file(request, fullpath, max_age, immutable=False, revalidate=False, encodings=False, sendfile_url=None):
+    """
+    Serves a file from disk with ETag/Last-Modified validators, single
+    byte-range support and long-lived cache headers. When `sendfile_url` is
+    given the body is left to the front-end server (X-Accel-Redirect or
+    X-Sendfile), otherwise FileResponse hands the file to wsgi.file_wrapper.
+    """
+    content_type, file_encoding = mimetypes.guess_type(fullpath)
+    if file_encoding:
+        # A compressed file fetched by name is an archive, not an encoded body.
+        content_type = ARCHIVE_TYPES.get(file_encoding, 'application/octet-stream')
+    content_type = content_type or 'application/octet-stream'
+    encoding, fullpath = pick_encoding(request, fullpath) if encodings else (None, fullpath)
+    stat = os.stat(fullpath)
+    etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+    cache_control = 'public, max-age=%d' % max_age
+    if immutable:
+        cache_control += ', immutable'
+    if revalidate:
+        cache_control += ', must-revalidate'
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control,
+    }
+    if encodings:
+        headers['Vary'] = 'Accept-Encoding'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        if response.status_code == 304:
+            for header, value in headers.items():
+                response.headers[header] = value
+        return response
+
+    if sendfile_url is not None:
+        response = HttpResponse(content_type=content_type)
+        response.headers[settings.MEDIA_SENDFILE_HEADER] = sendfile_url
+    else:
+        byte_range = None
+        if encoding is None and 'Range' in request.headers and if_range_matches(request, etag, stat.st_mtime_ns):
+            try:
+                byte_range = parse_range(request.headers['Range'], stat.st_size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response.headers['Content-Range'] = 'bytes */%d' % stat.st_size
+                return response
+
+        file = open(fullpath, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            if end == stat.st_size - 1:
+                # Open-ended ranges keep the real file so file_wrapper can sendfile() it.
+                file.seek(start)
+                response = FileResponse(file, status=206, content_type=content_type)
+            else:
+                response = FileResponse(RangeFile(file, start, length), status=206, content_type=content_type)
+            response.headers['Content-Length'] = str(length)
+            response.headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, stat.st_size)
+        del response.headers['Content-Disposition']
+        if encoding is None:
+            response.headers['Accept-Ranges'] = 'bytes'
+        else:
+            response.headers['Content-Encoding'] = encoding
+
+    for header, value in headers.items():
+        response.headers[header] = value
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    fullpath = resolve_path(settings.MEDIA_ROOT, path)
+    sendfile_url = None
+    if settings.MEDIA_SENDFILE_HEADER:
+        relative = os.path.relpath(fullpath, settings.MEDIA_ROOT).replace(os.sep, '/')
+        # Header values must stay ASCII; nginx and mod_xsendfile both unescape them.
+        if settings.MEDIA_SENDFILE_HEADER == 'X-Accel-Redirect':
+            sendfile_url = settings.MEDIA_SENDFILE_URL.rstrip('/') + '/' + quote(relative)
+        else:
+            sendfile_url = quote(fullpath)
+    return serve_file(request, fullpath, settings.MEDIA_CACHE_MAX_AGE, revalidate=True, sendfile_url=sendfile_url)
+
+
+class StaticFilesMiddleware:
+    """
+    Serves collected files under STATIC_URL straight from STATIC_ROOT,
+    before sessions and auth run. Hashed names from the manifest storage are
+    marked immutable; precompressed .br/.gz siblings are used when accepted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            try:
+                fullpath = resolve_path(settings.STATIC_ROOT, request.path_info[len(self.prefix):])
+            except Http404:
+                return self.get_response(request)
+            if HASHED_NAME_RE.search(fullpath):
+                return serve_file(request, fullpath, settings.STATIC_CACHE_MAX_AGE, immutable=True, encodings=True)
+            return serve_file(request, fullpath, settings.STATIC_UNHASHED_MAX_AGE, encodings=True)
+        return self.get_response(request)
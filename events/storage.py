@@ -0,0 +1,45 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes .gz and .br siblings of every hashed
+    text asset at collectstatic time, so they can be served without
+    compressing on each request.
+    """
+    compress_extensions = ('.css', '.js', '.mjs', '.map', '.svg', '.html', '.txt', '.json', '.xml', '.ico')
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(self.compress_extensions):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        compressors = [('.gz', lambda content: gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            compressors.append(('.br', brotli.compress))
+        # The hashed name pins the content, so an existing sibling is current.
+        compressors = [(suffix, func) for suffix, func in compressors if not self.exists(name + suffix)]
+        if not compressors:
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < self.compress_min_size:
+            return
+        for suffix, func in compressors:
+            compressed = func(content)
+            # Only keep variants that actually save bytes on the wire.
+            if len(compressed) < len(content) * 0.95:
+                self._save(name + suffix, ContentFile(compressed))
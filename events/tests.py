@@ -1,3 +1,200 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+from urllib.parse import unquote
 
-# Create your tests here.
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, override_settings
+
+from .storage import CompressedManifestStaticFilesStorage
+
+CSS = b'.event-card { margin: 0; padding: 1rem; }\n' * 40
+HASHED_CSS = 'css/site.0123456789ab.css'
+
+
+class ServingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(MEDIA_ROOT=self.root, STATIC_ROOT=self.root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+
+class MediaServingTests(ServingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write('event_images/poster.txt', b'0123456789')
+
+    def get(self, **headers):
+        return self.client.get('/media/event_images/poster.txt', headers=headers)
+
+    def test_full_response_has_validators(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300, must-revalidate')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_on_same_size_replacement(self):
+        etag = self.get()['ETag']
+        path = self.write('event_images/poster.txt', b'abcdefghij')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertNotEqual(self.get()['ETag'], etag)
+
+    def test_ranges(self):
+        cases = [
+            ('bytes=2-4', b'234', 'bytes 2-4/10'),
+            ('bytes=5-', b'56789', 'bytes 5-9/10'),
+            ('bytes=-3', b'789', 'bytes 7-9/10'),
+        ]
+        for header, body, content_range in cases:
+            with self.subTest(range=header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), body)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+                self.assertEqual(response['Content-Range'], content_range)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(range='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_invalid_range_is_ignored(self):
+        response = self.get(range='bytes=5-3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_stale_if_range_returns_full_body(self):
+        response = self.get(range='bytes=2-4', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_traversal_and_directories_are_not_found(self):
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/event_images/../../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/event_images/').status_code, 404)
+
+    def test_unsafe_methods_are_rejected(self):
+        self.assertEqual(self.client.post('/media/event_images/poster.txt').status_code, 405)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect', MEDIA_SENDFILE_URL='/protected-media/')
+    def test_x_accel_redirect(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/event_images/poster.txt')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect', MEDIA_SENDFILE_URL='/protected-media/')
+    def test_x_accel_redirect_quotes_non_ascii_names(self):
+        self.write('event_images/পসটর_ছব.jpg', b'0123456789')
+        response = self.client.get('/media/event_images/পসটর_ছব.jpg')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/event_images/%E0%A6%AA%E0%A6%B8%E0%A6%9F%E0%A6%B0_%E0%A6%9B%E0%A6%AC.jpg',
+        )
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Sendfile')
+    def test_x_sendfile_quotes_non_ascii_names(self):
+        path = self.write('event_images/পসটর ছব.jpg', b'0123456789')
+        response = self.client.get('/media/event_images/পসটর ছব.jpg')
+        self.assertTrue(response['X-Sendfile'].isascii())
+        self.assertEqual(unquote(response['X-Sendfile']), path)
+
+
+class StaticServingTests(ServingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(HASHED_CSS, CSS)
+        self.write(HASHED_CSS + '.gz', gzip.compress(CSS))
+
+    def get(self, **headers):
+        return self.client.get('/static/' + HASHED_CSS, headers=headers)
+
+    def test_hashed_file_is_immutable(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_gzip_variant_served_when_accepted(self):
+        response = self.get(accept_encoding='br;q=0.5, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        body = b''.join(response.streaming_content)
+        self.assertLess(len(body), len(CSS))
+        self.assertEqual(gzip.decompress(body), CSS)
+
+    def test_sibling_fetched_by_name_is_an_archive(self):
+        response = self.client.get('/static/' + HASHED_CSS + '.gz', headers={'accept_encoding': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_gzip_variant_not_served_when_refused(self):
+        response = self.get(accept_encoding='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+
+class CompressedStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.target)
+
+    def collect(self, files):
+        source = FileSystemStorage(location=self.source)
+        storage = CompressedManifestStaticFilesStorage(location=self.target, base_url='/static/')
+        paths = {}
+        for name, content in files.items():
+            path = os.path.join(self.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            with source.open(name) as f:
+                storage.save(name, f)
+            paths[name] = (source, name)
+        list(storage.post_process(paths))
+        return storage
+
+    def test_gzip_siblings_for_compressible_files_only(self):
+        storage = self.collect({
+            'css/site.css': CSS,
+            'css/tiny.css': b'a{}',
+            'img/logo.png': b'\x89PNG' + b'\x00' * 1024,
+        })
+        site = storage.stored_name('css/site.css')
+        self.assertTrue(storage.exists(site + '.gz'))
+        self.assertLess(storage.size(site + '.gz'), storage.size(site))
+        with storage.open(site + '.gz') as f:
+            self.assertEqual(gzip.decompress(f.read()), CSS)
+        self.assertFalse(storage.exists(storage.stored_name('css/tiny.css') + '.gz'))
+        self.assertFalse(storage.exists(storage.stored_name('img/logo.png') + '.gz'))
+
+    def test_existing_siblings_are_not_rewritten(self):
+        storage = self.collect({'css/site.css': CSS})
+        sibling = storage.path(storage.stored_name('css/site.css') + '.gz')
+        os.utime(sibling, ns=(0, 0))
+        self.collect({'css/site.css': CSS})
+        self.assertEqual(os.stat(sibling).st_mtime_ns, 0)